@@ -18,6 +18,9 @@ from config import settings
 # Import all your models so your Alembic can detect them
 from models.user import User
 from models.link import Link
+from models.auth import PasswordResetToken
+from models.analytics import ClickEvent
+from models.email import EmailLog
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,54 @@
+"""add click event indexes
+
+Revision ID: 3f9c2a7d41b8
+Revises: 4a1d8e6b3c27
+Create Date: 2026-10-15 09:12:04.517233
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2a7d41b8"
+down_revision: Union[str, Sequence[str], None] = "4a1d8e6b3c27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Analytics queries filter by link_id IN (...) and a clicked_at range.
+    # if_not_exists: create_all databases may already have these indexes
+    op.create_index(
+        "ix_clickevent_link_clicked",
+        "clickevent",
+        ["link_id", "clicked_at"],
+        unique=False,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_clickevent_clicked_at",
+        "clickevent",
+        ["clicked_at"],
+        unique=False,
+        if_not_exists=True,
+    )
+    # BRIN stays tiny on the append-only click log for large date-range scans
+    op.create_index(
+        "ix_clickevent_clicked_brin",
+        "clickevent",
+        ["clicked_at"],
+        unique=False,
+        postgresql_using="brin",
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_clickevent_clicked_brin", table_name="clickevent")
+    op.drop_index("ix_clickevent_clicked_at", table_name="clickevent")
+    op.drop_index("ix_clickevent_link_clicked", table_name="clickevent")
@@ -0,0 +1,57 @@
+"""recreate click event table
+
+Revision ID: 4a1d8e6b3c27
+Revises: e500915cb720
+Create Date: 2026-10-15 09:05:41.270318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "4a1d8e6b3c27"
+down_revision: Union[str, Sequence[str], None] = "e500915cb720"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # e500915cb720 dropped clickevent; bring it back for databases migrated
+    # through that revision (create_all databases already have it)
+    if sa.inspect(op.get_bind()).has_table("clickevent"):
+        return
+
+    op.create_table(
+        "clickevent",
+        sa.Column(
+            "ip_address", sqlmodel.sql.sqltypes.AutoString(length=45), nullable=True
+        ),
+        sa.Column(
+            "user_agent", sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True
+        ),
+        sa.Column(
+            "referer", sqlmodel.sql.sqltypes.AutoString(length=500), nullable=True
+        ),
+        sa.Column("country", sqlmodel.sql.sqltypes.AutoString(length=2), nullable=True),
+        sa.Column(
+            "device_type", sqlmodel.sql.sqltypes.AutoString(length=20), nullable=True
+        ),
+        sa.Column(
+            "browser", sqlmodel.sql.sqltypes.AutoString(length=50), nullable=True
+        ),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("link_id", sa.Integer(), nullable=False),
+        sa.Column("clicked_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["link_id"], ["link.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("clickevent")
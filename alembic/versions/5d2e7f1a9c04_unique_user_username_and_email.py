@@ -0,0 +1,35 @@
+"""unique user username and email
+
+Revision ID: 5d2e7f1a9c04
+Revises: 8b41d6e2c9f3
+Create Date: 2026-10-15 12:41:09.527316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2e7f1a9c04"
+down_revision: Union[str, Sequence[str], None] = "8b41d6e2c9f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Make signup duplicates race-safe at the database level
+    op.drop_index(op.f("ix_user_username"), table_name="user")
+    op.create_index(op.f("ix_user_username"), "user", ["username"], unique=True)
+    op.drop_index(op.f("ix_user_email"), table_name="user")
+    op.create_index(op.f("ix_user_email"), "user", ["email"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_user_email"), table_name="user")
+    op.create_index(op.f("ix_user_email"), "user", ["email"], unique=False)
+    op.drop_index(op.f("ix_user_username"), table_name="user")
+    op.create_index(op.f("ix_user_username"), "user", ["username"], unique=False)
@@ -0,0 +1,69 @@
+"""recreate email log table
+
+Revision ID: 6c8f2b4e1d93
+Revises: 5d2e7f1a9c04
+Create Date: 2026-10-15 14:12:07.931584
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "6c8f2b4e1d93"
+down_revision: Union[str, Sequence[str], None] = "5d2e7f1a9c04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Dropping the table in e500915cb720 left the Postgres enum type behind
+email_type = postgresql.ENUM(
+    "WELCOME",
+    "PASSWORD_RESET",
+    "ANALYTICS_SUMMARY",
+    name="emailtype",
+    create_type=False,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # e500915cb720 dropped emaillog; bring it back for databases migrated
+    # through that revision (create_all databases already have it)
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("emaillog"):
+        return
+
+    email_type.create(bind, checkfirst=True)
+    op.create_table(
+        "emaillog",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("email_type", email_type, nullable=False),
+        sa.Column(
+            "recipient_email", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("subject", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(), nullable=False),
+        sa.Column("success", sa.Boolean(), nullable=False),
+        sa.Column("error_message", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("analytics_period_start", sa.DateTime(), nullable=True),
+        sa.Column("analytics_period_end", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_emaillog_recipient_email"),
+        "emaillog",
+        ["recipient_email"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_emaillog_recipient_email"), table_name="emaillog")
+    op.drop_table("emaillog")
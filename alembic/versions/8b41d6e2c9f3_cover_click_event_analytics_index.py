@@ -0,0 +1,56 @@
+"""cover click event analytics index
+
+Revision ID: 8b41d6e2c9f3
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-15 11:02:37.184905
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8b41d6e2c9f3"
+down_revision: Union[str, Sequence[str], None] = "3f9c2a7d41b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the covering index before dropping the old one, without locking
+    # writes to the click log
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_clickevent_link_time",
+            "clickevent",
+            ["link_id", "clicked_at"],
+            unique=False,
+            postgresql_include=["ip_address", "country", "device_type"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_clickevent_link_clicked",
+            table_name="clickevent",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_clickevent_link_clicked",
+            "clickevent",
+            ["link_id", "clicked_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_clickevent_link_time",
+            table_name="clickevent",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,56 @@
+"""add email log indexes
+
+Revision ID: b7c3e9a2d615
+Revises: 6c8f2b4e1d93
+Create Date: 2026-10-15 14:18:52.406173
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b7c3e9a2d615"
+down_revision: Union[str, Sequence[str], None] = "6c8f2b4e1d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build without blocking email log writes; create_all databases may
+    # already have them
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_emaillog_dedup",
+            "emaillog",
+            ["email_type", "analytics_period_start", "user_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_emaillog_stats",
+            "emaillog",
+            ["email_type", "sent_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_emaillog_stats",
+            table_name="emaillog",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_emaillog_dedup",
+            table_name="emaillog",
+            postgresql_concurrently=True,
+        )
@@ -1,3 +1,4 @@
+from functools import cached_property
 from pydantic_settings import BaseSettings
 
 
@@ -5,6 +6,12 @@ class Settings(BaseSettings):
     # Database URL
     database_url: str
 
+    # Database connection pool
+    database_pool_size: int = 20
+    database_pool_overflow: int = 10
+    database_pool_timeout: int = 5
+    database_pool_recycle: int = 300
+
     # JWT
     secret_key: str
     algorithm: str = "HS256"
@@ -14,6 +21,11 @@ class Settings(BaseSettings):
     app_name: str = "BioClick"
     debug: bool = False
 
+    # Run SQLModel create_all at startup outside debug. On by default: the
+    # Alembic chain can't yet build the schema from an empty database, so
+    # only turn this off where migrations have already created every table
+    run_create_all: bool = True
+
     # Email Settings
     resend_api_key: str
     from_email: str = "info@bioclick.xyz"
@@ -32,6 +44,9 @@ class Settings(BaseSettings):
     # Trusted hosts for production
     allowed_hosts: str = "localhost,127.0.0.1,bioclick-backend.onrender.com,bioclick-frontend.netlify.app,*.netlify.app,*.onrender.com"
 
+    # Redis (shared rate limit storage); in-process memory when unset
+    redis_url: str | None = None
+
     # Rate Limiting
     rate_limit_per_minute: int = 60
 
@@ -40,18 +55,19 @@ class Settings(BaseSettings):
 
     class Config:
         env_file = ".env"
+        frozen = True
 
-    @property
-    def cors_origins_list(self) -> list[str]:
-        """Convert CORS origins string to list"""
-        return [origin.strip() for origin in self.cors_origins.split(",")]
+    @cached_property
+    def cors_origins_list(self) -> tuple[str, ...]:
+        """Convert CORS origins string to tuple (parsed once)"""
+        return tuple(origin.strip() for origin in self.cors_origins.split(","))
 
-    @property
-    def allowed_hosts_list(self) -> list[str]:
-        """Convert allowed hosts string to list"""
-        return [host.strip() for host in self.allowed_hosts.split(",")]
+    @cached_property
+    def allowed_hosts_list(self) -> tuple[str, ...]:
+        """Convert allowed hosts string to tuple (parsed once)"""
+        return tuple(host.strip() for host in self.allowed_hosts.split(","))
 
-    @property
+    @cached_property
     def is_production(self) -> bool:
         return self.environment == "production" or not self.debug
 
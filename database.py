@@ -1,4 +1,5 @@
 from sqlmodel import create_engine, Session, SQLModel
+from sqlalchemy.orm import sessionmaker
 from typing import Annotated
 from fastapi import Depends
 
@@ -12,7 +13,21 @@ engine = create_engine(
     url=settings.database_url,
     echo=settings.debug,  # SQL logging in development
     pool_pre_ping=True,  # Verify connection pool before use
-    pool_recycle=300,  # Recycle connection pooling every 5 minutes
+    pool_size=settings.database_pool_size,  # Persistent connections per worker
+    max_overflow=settings.database_pool_overflow,  # Extra connections under burst load
+    pool_timeout=settings.database_pool_timeout,  # Fail fast instead of queueing requests
+    pool_recycle=settings.database_pool_recycle,  # Recycle connections (default 5 minutes)
+    pool_use_lifo=True,  # Reuse warm connections; lets idle overflow drain
+)
+
+
+# Session factory; objects stay loaded after commit so responses and cached
+# users can be serialized without a reload round-trip
+SessionLocal = sessionmaker(
+    bind=engine,
+    class_=Session,
+    autoflush=False,
+    expire_on_commit=False,
 )
 
 
@@ -22,10 +37,16 @@ def create_db_and_tables():
 
 
 def get_session():
-    """Database session dependency"""
-    with Session(engine) as session:
-        yield session
-
-
-# Type alias for dependency injection
-SessionDep = Annotated[Session, Depends(get_session)]
+    """Database session dependency (one per request)"""
+    with SessionLocal() as session:
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+
+# Type alias for dependency injection. Function scope closes the session once
+# the endpoint's response is built, before it is sent to the client.
+SessionDep = Annotated[Session, Depends(get_session, scope="function")]
@@ -6,12 +6,12 @@ try:
     from .database import SessionDep
     from .models.user import User
     from .services.auth import AuthService
-    from .utils.security import verify_token
+    from .utils.security import verify_token, get_cached_user, cache_user
 except ImportError:
     from database import SessionDep
     from models.user import User
     from services.auth import AuthService
-    from utils.security import verify_token
+    from utils.security import verify_token, get_cached_user, cache_user
 
 # OAuth2 scheme for token-based authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -22,7 +22,7 @@ def get_auth_service(session: SessionDep) -> AuthService:
     return AuthService(session)
 
 
-async def get_current_user(
+def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
 ) -> User:
@@ -33,6 +33,11 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    # Serve repeat requests for the same token from the verified token cache
+    cached_user = get_cached_user(token)
+    if cached_user is not None:
+        return cached_user
+
     # Verify token
     payload = verify_token(token)
     if payload is None:
@@ -47,6 +52,7 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
+    cache_user(token, user, payload["exp"])
     return user
 
 
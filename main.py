@@ -1,10 +1,9 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from brotli_asgi import BrotliMiddleware
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 import time
 
@@ -14,36 +13,60 @@ try:
     from .config import settings
     from .database import create_db_and_tables
     from .routers import auth, users, links, analytics, admin
+    from .services.analytics import close_geoip_reader
+    from .tasks.scheduler import (
+        get_scheduler_health,
+        start_scheduler,
+        stop_scheduler,
+    )
+    from .tasks.click_writer import start_click_writer, stop_click_writer
+    from .tasks.click_counts import (
+        start_click_count_flusher,
+        stop_click_count_flusher,
+    )
+    from .utils.logger import setup_logging, shutdown_logging
+    from .utils.middleware import SecurityAndLogMiddleware
+    from .utils.rate_limit import limiter
 except ImportError:
     # Fall back to absolute imports (for gunicorn in production)
     from config import settings
     from database import create_db_and_tables
     from routers import auth, users, links, analytics, admin
-
-# Rate limiting
-limiter = Limiter(key_func=get_remote_address)
+    from services.analytics import close_geoip_reader
+    from tasks.scheduler import (
+        get_scheduler_health,
+        start_scheduler,
+        stop_scheduler,
+    )
+    from tasks.click_writer import start_click_writer, stop_click_writer
+    from tasks.click_counts import (
+        start_click_count_flusher,
+        stop_click_count_flusher,
+    )
+    from utils.logger import setup_logging, shutdown_logging
+    from utils.middleware import SecurityAndLogMiddleware
+    from utils.rate_limit import limiter
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # startup
+    setup_logging()
     print("🚀 Starting up BioClick API...")
-    create_db_and_tables()
-    print("✅ Database tables created successfully")
+    if settings.debug or settings.run_create_all:
+        create_db_and_tables()
+        print("✅ Database tables created successfully")
+
+    # Batch click events off the request path
+    start_click_writer()
+    start_click_count_flusher()
 
     # Start background scheduler (only in production)
     if not settings.debug:
         try:
-            try:
-                from .tasks.scheduler import start_scheduler
-            except ImportError:
-                from tasks.scheduler import start_scheduler
-
             start_scheduler()
             print(f"📆 Background email scheduler started")
-        except ImportError:
-            print("⚠️ Scheduler module not available")
         except Exception as e:
             print(f"⚠️ Failed to start scheduler: {e}")
     else:
@@ -54,19 +77,21 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("🛑 Shutting down BioClick API...")
 
+    # Flush queued click events before exiting
+    await stop_click_writer()
+    await stop_click_count_flusher()
+    close_geoip_reader()
+
     # Stop the background scheduler
     if not settings.debug:
         try:
-            try:
-                from .tasks.scheduler import stop_scheduler
-            except ImportError:
-                from tasks.scheduler import stop_scheduler
-
             stop_scheduler()
             print("📆 Background scheduler stopped")
         except:
             pass
 
+    shutdown_logging()
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -93,49 +118,18 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Compression middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compression middleware (brotli, falling back to gzip for older clients)
+app.add_middleware(BrotliMiddleware, quality=4, minimum_size=1000)
+
+# Security headers + request logging (production only, outermost)
+if not settings.debug:
+    app.add_middleware(SecurityAndLogMiddleware)
 
 # Rate limiting
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
-# Security headers middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
-
-    if not settings.debug:
-        response.headers["Strict-Transport-Security"] = (
-            "max-age=31536000; includeSubDomains"
-        )
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline';"
-        )
-
-    return response
-
-
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-
-    if not settings.debug:
-        print(
-            f"{request.method} {request.url.path} - Status: {response.status_code} - Time: {process_time:.3f}s"
-        )
-
-    return response
-
-
 # Include routers with rate limiting
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -176,6 +170,7 @@ async def api_health_check():
             "status": "healthy",
             "database": "connected",
             "environment": "development" if settings.debug else "production",
+            "scheduler": get_scheduler_health(),
             "timestamp": time.time(),
         }
     except Exception as e:
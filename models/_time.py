@@ -0,0 +1,6 @@
+from datetime import datetime, timezone
+from functools import partial
+
+# Shared timestamp default factory: a C-level partial instead of a
+# per-model lambda
+utcnow = partial(datetime.now, timezone.utc)
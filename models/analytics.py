@@ -1,5 +1,7 @@
 from sqlmodel import Field, SQLModel
-from datetime import datetime, timezone
+from sqlalchemy import Index
+from datetime import datetime
+from ._time import utcnow
 
 
 class ClickEventBase(SQLModel):
@@ -18,9 +20,21 @@ class ClickEventBase(SQLModel):
 class ClickEvent(ClickEventBase, table=True):
     """Database model for click events"""
 
+    __table_args__ = (
+        # Covering index: analytics aggregates become index-only scans
+        Index(
+            "ix_clickevent_link_time",
+            "link_id",
+            "clicked_at",
+            postgresql_include=["ip_address", "country", "device_type"],
+        ),
+        Index("ix_clickevent_clicked_at", "clicked_at"),
+        Index("ix_clickevent_clicked_brin", "clicked_at", postgresql_using="brin"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     link_id: int = Field(foreign_key="link.id")
-    clicked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    clicked_at: datetime = Field(default_factory=utcnow)
 
 
 class ClickEventCreate(ClickEventBase):
@@ -1,6 +1,7 @@
 from sqlmodel import Field, SQLModel
 from pydantic import EmailStr
-from datetime import datetime, timezone
+from datetime import datetime
+from ._time import utcnow
 
 
 class Token(SQLModel):
@@ -37,6 +38,6 @@ class PasswordResetToken(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     token: str = Field(index=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow)
     expires_at: datetime
     is_used: bool = Field(default=False)
@@ -1,6 +1,8 @@
 from sqlmodel import Field, SQLModel
-from datetime import datetime, timezone
+from sqlalchemy import Index
+from datetime import datetime
 from enum import Enum
+from ._time import utcnow
 
 
 class EmailType(str, Enum):
@@ -10,12 +12,24 @@ class EmailType(str, Enum):
 
 
 class EmailLog(SQLModel, table=True):
+    __table_args__ = (
+        # Weekly job's already-sent prefetch (index-only on Postgres)
+        Index(
+            "ix_emaillog_dedup",
+            "email_type",
+            "analytics_period_start",
+            "user_id",
+        ),
+        # Email stats: range scan by type and send time
+        Index("ix_emaillog_stats", "email_type", "sent_at"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     email_type: EmailType
     recipient_email: str = Field(index=True)
     subject: str
-    sent_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    sent_at: datetime = Field(default_factory=utcnow)
     success: bool = Field(default=True)
     error_message: str | None = Field(default=None)
 
@@ -1,6 +1,31 @@
+import re
 from sqlmodel import Field, SQLModel
-from datetime import datetime, timezone
+from datetime import datetime
 from pydantic import HttpUrl, field_validator
+from ._time import utcnow
+
+# Fast path for ordinary http(s) URLs: a hostname whose last label starts
+# with a letter (numeric/IP and punycode hosts excluded), a port in 0-65535,
+# and a path made only of RFC 3986 characters (no spaces, quotes, controls
+# or non-ASCII).
+# Anything that doesn't match still goes through the strict HttpUrl parser.
+_URL_RE = re.compile(
+    r"^https?://(?!(?:[^/?#]*\.)?xn--)"
+    r"(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)*[a-z](?:[a-z0-9-]*[a-z0-9])?"
+    r"(?::(?:6553[0-5]|655[0-2][0-9]|65[0-4][0-9]{2}|6[0-4][0-9]{3}"
+    r"|[1-5][0-9]{4}|[0-9]{1,4}))?"
+    r"(?:[/?#][a-z0-9\-._~:/?#\[\]@!$&'()*+,;=%]*)?\Z",
+    re.IGNORECASE,
+)
+
+
+def _validate_http_url(v: str) -> str:
+    """Validate URL format, skipping the full parse for plain URLs"""
+    if len(v) <= 2000 and _URL_RE.match(v):
+        return v
+    # This will raise validation if invalid URL
+    HttpUrl(v)
+    return v
 
 
 class LinkBase(SQLModel):
@@ -12,9 +37,7 @@ class LinkBase(SQLModel):
     @classmethod
     def validate_url(cls, v: str) -> str:
         """Validate URL format"""
-        # This will raise validation if invalid URL
-        HttpUrl(v)
-        return v
+        return _validate_http_url(v)
 
     description: str | None = Field(default=None, max_length=500)
     is_active: bool = Field(default=True)
@@ -25,7 +48,7 @@ class LinkBase(SQLModel):
 class Link(LinkBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
     click_count: int = Field(default=0)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow)
     updated_at: datetime | None = Field(default=None)
 
     # Foreign key to user
@@ -43,16 +66,14 @@ class LinkUpdate(SQLModel):
     is_active: bool | None = None
     display_order: int | None = None
     icon: str | None = Field(default=None, max_length=50)
-    updated_at: datetime | None = Field(
-        default_factory=lambda: datetime.now(timezone.utc)
-    )
+    updated_at: datetime | None = Field(default_factory=utcnow)
 
     @field_validator("url")
     @classmethod
     def validate_url(cls, v: str | None) -> str | None:
         """Validate URL format if provided"""
         if v is not None:  # Only validate if URL is provided
-            HttpUrl(v)  # This will raise a ValidationError if invalid
+            return _validate_http_url(v)
         return v
 
 
@@ -1,11 +1,12 @@
 from sqlmodel import Field, SQLModel
-from datetime import datetime, timezone
+from datetime import datetime
 from pydantic import EmailStr
+from ._time import utcnow
 
 
 class UserBase(SQLModel):
-    username: str = Field(index=True, min_length=3, max_length=50)
-    email: EmailStr = Field(index=True)
+    username: str = Field(index=True, unique=True, min_length=3, max_length=50)
+    email: EmailStr = Field(index=True, unique=True)
     full_name: str | None = Field(default=None, max_length=100)
     is_active: bool = Field(default=True)
 
@@ -13,7 +14,7 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
     hashed_password: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow)
     updated_at: datetime | None = Field(default=None)
 
 
@@ -25,9 +26,7 @@ class UserUpdate(SQLModel):
     email: EmailStr | None = None
     full_name: str | None = Field(default=None, max_length=100)
     is_active: bool | None = None
-    updated_at: datetime | None = Field(
-        default_factory=lambda: datetime.now(timezone.utc)
-    )
+    updated_at: datetime | None = Field(default_factory=utcnow)
 
 
 class UserPasswordChange(SQLModel):
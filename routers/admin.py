@@ -13,7 +13,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.post("/send-weekly-analytics")
-async def trigger_weekly_analytics(session: Session = Depends(get_session)):
+def trigger_weekly_analytics(session: Session = Depends(get_session)):
     """Manually trigger weekly analytics emails (for testing)"""
     try:
         result = EmailScheduler.send_weekly_analytics_emails(session)
@@ -29,7 +29,7 @@ async def trigger_weekly_analytics(session: Session = Depends(get_session)):
 
 
 @router.get("/email-stats")
-async def get_email_stats(days: int = 30, session: Session = Depends(get_session)):
+def get_email_stats(days: int = 30, session: Session = Depends(get_session)):
     """Get email sending statistics"""
     try:
         stats = EmailScheduler.get_analytics_email_stats(session, days)
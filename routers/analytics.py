@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Response
 
 try:
     from ..models.analytics import AnalyticsResponse, GeographicResponse
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
 @router.get("/", response_model=AnalyticsResponse)
-async def get_user_analytics(
+def get_user_analytics(
     current_user: CurrentActiveUser,
     session: SessionDep,
     days: int = Query(
@@ -23,11 +23,16 @@ async def get_user_analytics(
 ):
     """Get comprehensive analytics for the current user"""
     analytics_service = AnalyticsService(session)
-    return analytics_service.get_analytics(current_user.id, days)
+    analytics = analytics_service.get_analytics(current_user.id, days)
+    # Already a validated AnalyticsResponse; serialize directly instead of
+    # letting FastAPI dump and re-validate it through response_model
+    return Response(
+        content=analytics.model_dump_json(), media_type="application/json"
+    )
 
 
 @router.get("/geographic", response_model=GeographicResponse)
-async def get_geographic_analytics(
+def get_geographic_analytics(
     current_user: CurrentActiveUser,
     session: SessionDep,
     days: int = Query(
@@ -36,11 +41,14 @@ async def get_geographic_analytics(
 ):
     """Get geographic analytics fro the current user"""
     analytics_service = AnalyticsService(session)
-    return analytics_service.get_geographic_analytics(current_user.id, days)
+    geographic = analytics_service.get_geographic_analytics(current_user.id, days)
+    return Response(
+        content=geographic.model_dump_json(), media_type="application/json"
+    )
 
 
 @router.get("/test-geo")
-async def test_geolocation(
+def test_geolocation(
     session: SessionDep,
     ip: str = Query(description="IP address to test"),
 ):
@@ -1,8 +1,6 @@
-from fastapi import APIRouter, Depends, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Annotated
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 try:
 
@@ -15,6 +13,7 @@ try:
     )
     from ..models.user import UserPublic
     from ..dependencies import AuthServiceDep
+    from ..utils.rate_limit import limiter
 except ImportError:
     from models.auth import (
         Token,
@@ -25,27 +24,30 @@ except ImportError:
     )
     from models.user import UserPublic
     from dependencies import AuthServiceDep
+    from utils.rate_limit import limiter
 
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
-limiter = Limiter(key_func=get_remote_address)
 
 
 @router.post(
     "/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED
 )
 @limiter.limit("5/minute")  # Limit registration to 5 requests per minute
-async def register(
-    request: Request, user_register: UserRegister, auth_service: AuthServiceDep
+def register(
+    request: Request,
+    user_register: UserRegister,
+    auth_service: AuthServiceDep,
+    background_tasks: BackgroundTasks,
 ):
     """Register a new user"""
-    new_user = auth_service.create_user(user_register)
+    new_user = auth_service.create_user(user_register, background_tasks)
     return new_user
 
 
 @router.post("/login", response_model=Token)
 @limiter.limit("10/minute")  # Limit login to 10 requests per minute
-async def login(
+def login(
     request: Request,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     auth_service: AuthServiceDep,
@@ -57,7 +59,7 @@ async def login(
 
 @router.post("/login-json", response_model=Token)
 @limiter.limit("10/minute")  # Limit login to 10 requests per minute
-async def login_json(
+def login_json(
     request: Request, user_login: UserLogin, auth_service: AuthServiceDep
 ):
     """Login with JSON body (alternative to form data)"""
@@ -66,16 +68,19 @@ async def login_json(
 
 @router.post("/password-reset/request")
 @limiter.limit("3/minute")  # Limit password reset request to 3 requests per minute
-async def request_password_reset(
-    request: Request, reset_request: PasswordResetRequest, auth_service: AuthServiceDep
+def request_password_reset(
+    request: Request,
+    reset_request: PasswordResetRequest,
+    auth_service: AuthServiceDep,
+    background_tasks: BackgroundTasks,
 ):
     """Request password reset email"""
-    return auth_service.request_password_reset(reset_request)
+    return auth_service.request_password_reset(reset_request, background_tasks)
 
 
 @router.post("/password-reset/confirm")
 @limiter.limit("5/minute")  # Limit password reset confirm to 5 requests per minute
-async def confirm_password_reset(
+def confirm_password_reset(
     request: Request, reset_confirm: PasswordResetConfirm, auth_service: AuthServiceDep
 ):
     """Reset password with token"""
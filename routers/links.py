@@ -1,29 +1,51 @@
-from fastapi import APIRouter, HTTPException, status, Request
-from fastapi.responses import RedirectResponse
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import hashlib
+from urllib.parse import quote
+from pydantic import TypeAdapter
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    HTTPException,
+    status,
+    Request,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
 
 try:
     from ..models.link import LinkCreate, LinkUpdate, LinkPublic
     from ..dependencies import CurrentActiveUser, SessionDep
-    from ..services.link import LinkService
+    from ..services.link import LinkService, record_click
     from ..services.analytics import AnalyticsService
     from ..utils.helpers import get_client_ip
+    from ..utils.rate_limit import limiter
 except ImportError:
     from models.link import LinkCreate, LinkUpdate, LinkPublic
     from dependencies import CurrentActiveUser, SessionDep
-    from services.link import LinkService
+    from services.link import LinkService, record_click
     from services.analytics import AnalyticsService
     from utils.helpers import get_client_ip
+    from utils.rate_limit import limiter
 
 
 router = APIRouter(prefix="/links", tags=["links"])
-limiter = Limiter(key_func=get_remote_address)
+
+# Characters left unescaped in redirect locations (same set as RedirectResponse)
+_URL_SAFE = ":/%#?=@[]!$&'()*+,;"
+
+# Public profiles are cacheable by browsers (30s) and shared caches/CDNs (60s)
+_PUBLIC_PROFILE_CACHE_CONTROL = "public, max-age=30, s-maxage=60"
+_public_links_adapter = TypeAdapter(list[LinkPublic])
+
+
+def _opaque_tag(tag: str) -> str:
+    """Strip whitespace and the weak W/ prefix from an entity tag"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
 
 
 # Protected endpoints (authenticated users)
 @router.post("/", response_model=LinkPublic, status_code=status.HTTP_201_CREATED)
-async def create_link(
+def create_link(
     link_create: LinkCreate, current_user: CurrentActiveUser, session: SessionDep
 ):
     """Create a new link"""
@@ -32,7 +54,7 @@ async def create_link(
 
 
 @router.get("/", response_model=list[LinkPublic])
-async def get_user_links(
+def get_user_links(
     current_user: CurrentActiveUser,
     session: SessionDep,
     skip: int = 0,
@@ -44,7 +66,7 @@ async def get_user_links(
 
 
 @router.get("/{link_id}", response_model=LinkPublic)
-async def get_link(link_id: int, current_user: CurrentActiveUser, session: SessionDep):
+def get_link(link_id: int, current_user: CurrentActiveUser, session: SessionDep):
     """Get a specific link"""
     link_service = LinkService(session)
     link = link_service.get_link(link_id)
@@ -59,7 +81,7 @@ async def get_link(link_id: int, current_user: CurrentActiveUser, session: Sessi
 
 
 @router.patch("/{link_id}", response_model=LinkPublic)
-async def update_link(
+def update_link(
     link_id: int,
     link_update: LinkUpdate,
     current_user: CurrentActiveUser,
@@ -80,7 +102,7 @@ async def update_link(
 
 
 @router.delete("/{link_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_link(
+def delete_link(
     link_id: int, current_user: CurrentActiveUser, session: SessionDep
 ):
     """Delete a specific link"""
@@ -99,7 +121,7 @@ async def delete_link(
 # Public endpoints with rate limiting
 @router.post("/{link_id}/click", response_model=LinkPublic)
 @limiter.limit("100/minute")  # Limit clicks to 100 per minute
-async def track_click(request: Request, link_id: int, session: SessionDep):
+def track_click(request: Request, link_id: int, session: SessionDep):
     """Track a click on a link (public endpoint) with rate limiting"""
     link_service = LinkService(session)
     return link_service.increment_click_count(link_id)
@@ -107,13 +129,19 @@ async def track_click(request: Request, link_id: int, session: SessionDep):
 
 @router.get("/{link_id}/redirect")
 @limiter.limit("100/minute")  # Limit redirects to 100 per minute
-async def click_and_redirect(request: Request, link_id: int, session: SessionDep):
+async def click_and_redirect(
+    request: Request,
+    link_id: int,
+    session: SessionDep,
+    background_tasks: BackgroundTasks,
+):
     """Track click and redirect to the actual URL (public endpoint) with rate limiting"""
     link_service = LinkService(session)
     analytics_service = AnalyticsService(session)
 
-    # Get the link
-    link = link_service.get_link(link_id)
+    # Get the link (blocking lookup runs in the threadpool so the click
+    # below can be queued from the event loop)
+    link = await run_in_threadpool(link_service.get_link_cached, link_id)
 
     if not link.is_active:
         raise HTTPException(
@@ -125,20 +153,54 @@ async def click_and_redirect(request: Request, link_id: int, session: SessionDep
     user_agent = request.headers.get("user-agent")
     referer = request.headers.get("referer")
 
-    # Track the click with metadata
+    # Track the click with metadata (queued for the batched click writer)
     analytics_service.track_click(
         link_id=link_id, ip_address=ip_address, user_agent=user_agent, referer=referer
     )
 
-    # Also increment the simple click counter
-    link_service.increment_click_count(link_id)
-
-    return RedirectResponse(url=str(link.url), status_code=status.HTTP_302_FOUND)
+    # Also increment the simple click counter, once the client has its redirect
+    background_tasks.add_task(record_click, link_id)
+
+    # Bare 302 without a body, escaped exactly like RedirectResponse (spaces,
+    # quotes, control characters and non-ASCII all get percent-encoded)
+    return Response(
+        status_code=status.HTTP_302_FOUND,
+        headers={
+            "location": quote(link.url, safe=_URL_SAFE),
+            "cache-control": "private, no-store",
+        },
+    )
 
 
 @router.get("/public/{username}", response_model=list[LinkPublic])
 @limiter.limit("30/minute")  # Limit public user profile to 30 requests per minute
-async def get_public_user_profile(request: Request, username: str, session: SessionDep):
+def get_public_user_profile(request: Request, username: str, session: SessionDep):
     """Get public view of user's active links (public endpoint) with rate limiting"""
     link_service = LinkService(session)
-    return link_service.get_public_user_links(username)
+
+    # Derive the ETag from an aggregate query so a matching revalidation is
+    # answered with a 304 before any link rows are loaded or serialised
+    version = link_service.get_public_user_links_version(username)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    digest = hashlib.blake2b(
+        f"{username}:{version}".encode(), digest_size=16
+    ).hexdigest()
+    etag = f'W/"{digest}"'
+    headers = {"etag": etag, "cache-control": _PUBLIC_PROFILE_CACHE_CONTROL}
+
+    # Weak comparison (RFC 9110 13.1.2): W/ is ignored on both sides
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or any(
+            _opaque_tag(tag) == _opaque_tag(etag) for tag in if_none_match.split(",")
+        )
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    links = link_service.get_public_user_links(username)
+    body = _public_links_adapter.dump_json(links)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -21,13 +21,13 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserPublic)
-async def get_current_user_profile(current_user: CurrentActiveUser):
+def get_current_user_profile(current_user: CurrentActiveUser):
     """Get current user's profile"""
     return current_user
 
 
 @router.patch("/me", response_model=UserPublic)
-async def update_current_user_profile(
+def update_current_user_profile(
     user_update: UserUpdate, current_user: CurrentActiveUser, session: SessionDep
 ):
     """Update current user's profile"""
@@ -36,7 +36,7 @@ async def update_current_user_profile(
 
 
 @router.post("/change-password")
-async def change_password(
+def change_password(
     password_data: UserPasswordChange,
     current_user: CurrentActiveUser,
     session: SessionDep,
@@ -62,7 +62,7 @@ async def change_password(
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_current_user_account(
+def delete_current_user_account(
     current_user: CurrentActiveUser, session: SessionDep
 ):
     """Delete current user's account"""
@@ -71,7 +71,7 @@ async def delete_current_user_account(
 
 
 @router.get("/me/links", response_model=list[LinkPublic])
-async def get_current_user_links(current_user: CurrentActiveUser, session: SessionDep):
+def get_current_user_links(current_user: CurrentActiveUser, session: SessionDep):
     """Get all links for current user"""
     link_service = LinkService(session)
     return link_service.get_user_links(current_user.id)
@@ -1,6 +1,12 @@
+import asyncio
+import ipaddress
+import logging
+from collections import Counter
 from datetime import datetime, timedelta, timezone
-from typing import Dict
-from sqlmodel import Session, select, func, and_
+from functools import lru_cache
+from typing import Sequence
+from sqlalchemy import Row
+from sqlmodel import Session, select, func, and_, case
 import user_agents
 import geoip2.database
 import geoip2.errors
@@ -9,7 +15,6 @@ try:
 
     from ..models.analytics import (
         ClickEvent,
-        ClickEventCreate,
         DailyStats,
         LinkStats,
         DeviceStats,
@@ -19,10 +24,10 @@ try:
         AnalyticsResponse,
     )
     from ..models.link import Link
+    from ..models._time import utcnow
 except ImportError:
     from models.analytics import (
         ClickEvent,
-        ClickEventCreate,
         DailyStats,
         LinkStats,
         DeviceStats,
@@ -32,9 +37,122 @@ except ImportError:
         AnalyticsResponse,
     )
     from models.link import Link
+    from models._time import utcnow
+
+
+logger = logging.getLogger("bioclick.clicks")
+
+GEOIP_DATABASE_PATH = "./GeoLite2-Country.mmdb"
+
+
+def _open_geoip_reader() -> geoip2.database.Reader | None:
+    try:
+        return geoip2.database.Reader(GEOIP_DATABASE_PATH)
+    except (FileNotFoundError, OSError):
+        return None
+
+
+# Opened once per process; None when the GeoIP2 database is missing
+_geoip_reader = _open_geoip_reader()
+
+
+@lru_cache(maxsize=200_000)
+def _lookup_country(ip_address: str) -> str | None:
+    """Get country code from IP address using the shared GeoIP2 reader"""
+    if _geoip_reader is None:
+        return None
+    try:
+        # Parse once and hand the reader the address object so it skips its own parse
+        ip = ipaddress.ip_address(ip_address)
+        return _geoip_reader.country(ip).country.iso_code
+    except (geoip2.errors.AddressNotFoundError, ValueError):
+        return None
+
+
+def close_geoip_reader() -> None:
+    """Close the shared GeoIP2 reader (called on shutdown)"""
+    if _geoip_reader is not None:
+        _geoip_reader.close()
+
+
+@lru_cache(maxsize=50_000)
+def _classify_user_agent(user_agent: str) -> tuple[str, str]:
+    """Get (device_type, browser) for a user agent string (repeats are cached)"""
+    ua = user_agents.parse(user_agent)
+
+    device_type = "unknown"
+    if ua.is_mobile:
+        device_type = "mobile"
+    elif ua.is_tablet:
+        device_type = "tablet"
+    elif ua.is_pc:
+        device_type = "desktop"
+
+    browser = ua.browser.family if ua.browser.family else "unknown"
+    return device_type, browser
+
+
+# Map ISO country codes to country names
+_COUNTRY_NAMES: dict[str, str] = {
+    "US": "United States",
+    "GB": "United Kingdom",
+    "CA": "Canada",
+    "AU": "Australia",
+    "DE": "Germany",
+    "FR": "France",
+    "IT": "Italy",
+    "ES": "Spain",
+    "NL": "Netherlands",
+    "BR": "Brazil",
+    "JP": "Japan",
+    "CN": "China",
+    "IN": "India",
+    "MX": "Mexico",
+    "AR": "Argentina",
+    "CL": "Chile",
+    "CO": "Colombia",
+    "PE": "Peru",
+    "RU": "Russia",
+    "UA": "Ukraine",
+    "PL": "Poland",
+    "SE": "Sweden",
+    "NO": "Norway",
+    "DK": "Denmark",
+    "FI": "Finland",
+    "CH": "Switzerland",
+    "AT": "Austria",
+    "BE": "Belgium",
+    "PT": "Portugal",
+    "IE": "Ireland",
+    "NZ": "New Zealand",
+    "ZA": "South Africa",
+    "EG": "Egypt",
+    "NG": "Nigeria",
+    "KE": "Kenya",
+    "MA": "Morocco",
+    "TH": "Thailand",
+    "VN": "Vietnam",
+    "SG": "Singapore",
+    "MY": "Malaysia",
+    "ID": "Indonesia",
+    "PH": "Philippines",
+    "KR": "South Korea",
+    "TR": "Turkey",
+    "SA": "Saudi Arabia",
+    "AE": "UAE",
+    "IL": "Israel",
+    "QA": "Qatar",
+    # Add more as needed
+}
+
+
+# Click events waiting to be batch-inserted by tasks.click_writer
+CLICK_QUEUE: asyncio.Queue[dict] = asyncio.Queue(maxsize=10_000)
 
 
 class AnalyticsService:
+    __slots__ = ("session",)
+
     def __init__(self, session: Session):
         self.session = session
 
@@ -44,44 +162,38 @@ class AnalyticsService:
         ip_address: str | None = None,
         user_agent: str | None = None,
         referer: str | None = None,
-    ) -> ClickEvent:
-        """Track a click event with metadata"""
+    ) -> None:
+        """Track a click event with metadata (queued for a batched insert)"""
 
         # Parse user agent for device/browser info
-        device_type = "unknown"
-        browser = "unknown"
-
         if user_agent:
-            ua = user_agents.parse(user_agent)
-            if ua.is_mobile:
-                device_type = "mobile"
-            elif ua.is_tablet:
-                device_type = "tablet"
-            elif ua.is_pc:
-                device_type = "desktop"
-
-            browser = ua.browser.family if ua.browser.family else "unknown"
+            device_type, browser = _classify_user_agent(user_agent)
+        else:
+            device_type, browser = "unknown", "unknown"
 
         # Get country code from IP (you'll need to add GeoIP2 database)
         country = self._get_country_from_ip(ip_address) if ip_address else None
 
-        # Create click event
-        click_data = ClickEventCreate(
-            link_id=link_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            referer=referer,
-            country=country,
-            device_type=device_type,
-            browser=browser,
-        )
-
-        click_event = ClickEvent(**click_data.model_dump())
-        self.session.add(click_event)
-        self.session.commit()
-        self.session.refresh(click_event)
-
-        return click_event
+        # Queue a plain row dict ready for the writer's bulk insert; the
+        # inputs are already validated, so skip a Pydantic model round-trip
+        click_row = {
+            "link_id": link_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "referer": referer,
+            "country": country,
+            "device_type": device_type,
+            "browser": browser,
+            "clicked_at": utcnow(),
+        }
+        try:
+            CLICK_QUEUE.put_nowait(click_row)
+        except asyncio.QueueFull:
+            # Writer is falling behind; shed the event rather than block the
+            # event loop on a synchronous insert
+            logger.warning(
+                "Click queue full, dropping click event for link %s", link_id
+            )
 
     def get_geographic_analytics(
         self, user_id: int, days: int = 30
@@ -93,11 +205,9 @@ class AnalyticsService:
         start_date = end_date - timedelta(days=days)
 
         # get user's links
-        user_links = self.session.exec(
-            select(Link).where(Link.user_id == user_id)
-        ).all()
-
-        link_ids = [link.id for link in user_links]
+        link_ids = list(
+            self.session.exec(select(Link.id).where(Link.user_id == user_id)).all()
+        )
 
         if not link_ids:
             return GeographicResponse(
@@ -130,8 +240,9 @@ class AnalyticsService:
         start_date = end_date - timedelta(days=days)
 
         # Get user's links
+        # Only the id and title are needed; skip full ORM objects
         user_links = self.session.exec(
-            select(Link).where(Link.user_id == user_id)
+            select(Link.id, Link.title).where(Link.user_id == user_id)
         ).all()
 
         link_ids = [link.id for link in user_links]
@@ -146,38 +257,46 @@ class AnalyticsService:
                 growth_percentage=0.0,
             )
 
-        # Total clicks in period
-        total_clicks = self.session.exec(
-            select(func.count(ClickEvent.id)).where(
-                and_(
-                    ClickEvent.link_id.in_(link_ids),
-                    ClickEvent.clicked_at >= start_date,
-                )
-            )
-        ).one()
+        previous_start = start_date - timedelta(days=days)
+        in_period = ClickEvent.clicked_at >= start_date
 
-        # Unique visitors (unique IP addresses)
-        unique_visitors = self.session.exec(
-            select(func.count(func.distinct(ClickEvent.ip_address))).where(
+        # Current/previous period clicks and unique visitors in one pass
+        totals = self.session.exec(
+            select(
+                func.count(ClickEvent.id).filter(in_period).label("current"),
+                func.count(ClickEvent.id)
+                .filter(ClickEvent.clicked_at < start_date)
+                .label("previous"),
+                func.count(
+                    func.distinct(case((in_period, ClickEvent.ip_address)))
+                ).label("unique"),
+            ).where(
                 and_(
                     ClickEvent.link_id.in_(link_ids),
-                    ClickEvent.clicked_at >= start_date,
-                    ClickEvent.ip_address.is_not(None),
+                    ClickEvent.clicked_at >= previous_start,
                 )
             )
         ).one()
 
+        total_clicks = totals.current
+        unique_visitors = totals.unique
+
+        # Daily, per-link and per-device counts from one grouped scan
+        daily_counts, link_counts, device_counts = self._get_click_breakdown(
+            link_ids, start_date, end_date
+        )
+
         # Daily statistics
-        daily_stats = self._get_daily_stats(link_ids, start_date, end_date)
+        daily_stats = self._get_daily_stats(daily_counts)
 
         # Top Links
-        top_links = self._get_top_links(user_links, start_date)
+        top_links = self._get_top_links(user_links, link_counts)
 
         # Device statistics
-        device_stats = self._get_device_stats(link_ids, start_date)
+        device_stats = self._get_device_stats(device_counts)
 
         # Growth calculation (compare to previous period)
-        growth_percentage = self._calculate_growth(link_ids, start_date, days)
+        growth_percentage = self._calculate_growth(total_clicks, totals.previous)
 
         return AnalyticsResponse(
             total_clicks=total_clicks,
@@ -188,15 +307,15 @@ class AnalyticsService:
             growth_percentage=growth_percentage,
         )
 
-    def _get_daily_stats(
+    def _get_click_breakdown(
         self, link_ids: list[int], start_date: datetime, end_date: datetime
-    ) -> list[DailyStats]:
-        """Get daily click statistics"""
-
-        # SQL to group clicks by date
+    ) -> tuple[Counter, Counter, Counter]:
+        """Count clicks per day, per link and per device type in one query"""
         stmt = (
             select(
                 func.date(ClickEvent.clicked_at).label("date"),
+                ClickEvent.link_id,
+                ClickEvent.device_type,
                 func.count(ClickEvent.id).label("clicks"),
             )
             .where(
@@ -206,35 +325,40 @@ class AnalyticsService:
                     ClickEvent.clicked_at <= end_date,
                 )
             )
-            .group_by(func.date(ClickEvent.clicked_at))
-            .order_by("date")
+            .group_by(
+                func.date(ClickEvent.clicked_at),
+                ClickEvent.link_id,
+                ClickEvent.device_type,
+            )
         )
 
-        results = self.session.exec(stmt).all()
+        daily_counts: Counter = Counter()
+        link_counts: Counter = Counter()
+        device_counts: Counter = Counter()
 
-        return [DailyStats(date=str(row.date), clicks=row.clicks) for row in results]
+        # Stream rows in chunks instead of materializing the full result
+        for row in self.session.exec(stmt.execution_options(yield_per=1000)):
+            daily_counts[row.date] += row.clicks
+            link_counts[row.link_id] += row.clicks
+            if row.device_type is not None:
+                device_counts[row.device_type] += row.clicks
+
+        return daily_counts, link_counts, device_counts
+
+    def _get_daily_stats(self, daily_counts: Counter) -> list[DailyStats]:
+        """Get daily click statistics"""
+        return [
+            DailyStats(date=str(date), clicks=clicks)
+            for date, clicks in sorted(daily_counts.items())
+        ]
 
     def _get_top_links(
-        self, links: list[Link], start_date: datetime
+        self, links: Sequence[Row], link_counts: Counter
     ) -> list[LinkStats]:
         """Get top performing links"""
 
-        link_performance = []
-        total_clicks = 0
-
-        for link in links:
-            # Count clicks for this link in the period
-            clicks = self.session.exec(
-                select(func.count(ClickEvent.id)).where(
-                    and_(
-                        ClickEvent.link_id == link.id,
-                        ClickEvent.clicked_at >= start_date,
-                    )
-                )
-            ).one()
-
-            total_clicks += clicks
-            link_performance.append((link, clicks))
+        total_clicks = sum(link_counts.values())
+        link_performance = [(link, link_counts[link.id]) for link in links]
 
         # Sort by clicks and calculate percentages
         link_performance.sort(key=lambda x: x[1], reverse=True)
@@ -253,67 +377,25 @@ class AnalyticsService:
 
         return top_links
 
-    def _get_device_stats(
-        self, link_ids: list[int], start_date: datetime
-    ) -> list[DeviceStats]:
+    def _get_device_stats(self, device_counts: Counter) -> list[DeviceStats]:
         """Get device type statistics"""
-        stmt = (
-            select(ClickEvent.device_type, func.count(ClickEvent.id).label("count"))
-            .where(
-                and_(
-                    ClickEvent.link_id.in_(link_ids),
-                    ClickEvent.clicked_at >= start_date,
-                    ClickEvent.device_type.is_not(None),
-                )
-            )
-            .group_by(ClickEvent.device_type)
-        )
-
-        results = self.session.exec(stmt).all()
-        total = sum(row.count for row in results)
+        total = sum(device_counts.values())
 
         if total == 0:
             return []
 
         return [
             DeviceStats(
-                device_type=row.device_type,
-                count=row.count,
-                percentage=round(row.count / total * 100, 1),
+                device_type=device_type,
+                count=count,
+                percentage=round(count / total * 100, 1),
             )
-            for row in results
+            for device_type, count in device_counts.items()
         ]
 
-    def _calculate_growth(
-        self, link_ids: list[int], start_date: datetime, days: int
-    ) -> float:
+    def _calculate_growth(self, current_clicks: int, previous_clicks: int) -> float:
         """Calculate growth percentage compared to previous period"""
 
-        # Previous period
-        previous_end = start_date
-        previous_start = previous_end - timedelta(days=days)
-
-        # Current period clicks
-        current_clicks = self.session.exec(
-            select(func.count(ClickEvent.id)).where(
-                and_(
-                    ClickEvent.link_id.in_(link_ids),
-                    ClickEvent.clicked_at >= start_date,
-                )
-            )
-        ).one()
-
-        # Previous period clicks
-        previous_clicks = self.session.exec(
-            select(func.count(ClickEvent.id)).where(
-                and_(
-                    ClickEvent.link_id.in_(link_ids),
-                    ClickEvent.clicked_at >= previous_start,
-                    ClickEvent.clicked_at < previous_end,
-                )
-            )
-        ).one()
-
         if previous_clicks == 0:
             return 100.0 if current_clicks > 0 else 0.0
 
@@ -322,12 +404,7 @@ class AnalyticsService:
 
     def _get_country_from_ip(self, ip_address: str) -> str | None:
         """Get country code from IP address using GeoIP2"""
-        try:
-            with geoip2.database.Reader("./GeoLite2-Country.mmdb") as reader:
-                response = reader.country(ip_address)
-                return response.country.iso_code
-        except (geoip2.errors.AddressNotFoundError, FileNotFoundError, OSError):
-            return None
+        return _lookup_country(ip_address)
 
     def _get_country_stats(
         self, link_ids: list[int], start_date: datetime
@@ -342,6 +419,8 @@ class AnalyticsService:
                 func.count(func.distinct(ClickEvent.ip_address)).label(
                     "unique_visitors"
                 ),
+                # Clicks across all countries, so only the top 10 rows are fetched
+                func.sum(func.count(ClickEvent.id)).over().label("total_clicks"),
             )
             .where(
                 and_(
@@ -352,17 +431,17 @@ class AnalyticsService:
             )
             .group_by(ClickEvent.country)
             .order_by(func.count(ClickEvent.id).desc())
+            .limit(10)  # Top 10 countries
         )
 
         results = self.session.exec(stmt).all()
-        total_clicks = sum(row.clicks for row in results)
 
         # Map country codes to names
-        country_names = self._get_country_names()
+        country_names = _COUNTRY_NAMES
 
         country_stats = []
         for row in results:
-            percentage = (row.clicks / total_clicks * 100) if total_clicks > 0 else 0
+            percentage = row.clicks / row.total_clicks * 100
             country_stats.append(
                 CountryStats(
                     country_code=row.country,
@@ -373,7 +452,7 @@ class AnalyticsService:
                 )
             )
 
-        return country_stats[:10]  # Top 10 countries
+        return country_stats
 
     def _get_city_stats(
         self, link_ids: list[int], start_date: datetime
@@ -408,57 +487,3 @@ class AnalyticsService:
 
         results = self.session.exec(stmt).all()
         return [DailyStats(date=str(row.date), clicks=row.clicks) for row in results]
-
-    def _get_country_names(self) -> Dict[str, str]:
-        """Map ISO country codes to country names"""
-        return {
-            "US": "United States",
-            "GB": "United Kingdom",
-            "CA": "Canada",
-            "AU": "Australia",
-            "DE": "Germany",
-            "FR": "France",
-            "IT": "Italy",
-            "ES": "Spain",
-            "NL": "Netherlands",
-            "BR": "Brazil",
-            "JP": "Japan",
-            "CN": "China",
-            "IN": "India",
-            "MX": "Mexico",
-            "AR": "Argentina",
-            "CL": "Chile",
-            "CO": "Colombia",
-            "PE": "Peru",
-            "RU": "Russia",
-            "UA": "Ukraine",
-            "PL": "Poland",
-            "SE": "Sweden",
-            "NO": "Norway",
-            "DK": "Denmark",
-            "FI": "Finland",
-            "CH": "Switzerland",
-            "AT": "Austria",
-            "BE": "Belgium",
-            "PT": "Portugal",
-            "IE": "Ireland",
-            "NZ": "New Zealand",
-            "ZA": "South Africa",
-            "EG": "Egypt",
-            "NG": "Nigeria",
-            "KE": "Kenya",
-            "MA": "Morocco",
-            "TH": "Thailand",
-            "VN": "Vietnam",
-            "SG": "Singapore",
-            "MY": "Malaysia",
-            "ID": "Indonesia",
-            "PH": "Philippines",
-            "KR": "South Korea",
-            "TR": "Turkey",
-            "SA": "Saudi Arabia",
-            "AE": "UAE",
-            "IL": "Israel",
-            "QA": "Qatar",
-            # Add more as needed
-        }
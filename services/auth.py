@@ -1,7 +1,8 @@
 from datetime import timedelta, datetime, timezone
 import secrets
-from sqlmodel import Session, select
-from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, or_
+from fastapi import BackgroundTasks, HTTPException, status
 
 try:
     from ..models.user import User, UserCreate
@@ -13,7 +14,12 @@ try:
         PasswordResetConfirm,
         PasswordResetToken,
     )
-    from ..utils.security import verify_password, get_password_hash, create_access_token
+    from ..utils.security import (
+        verify_and_update_password,
+        get_password_hash,
+        create_access_token,
+        invalidate_cached_user,
+    )
     from ..config import settings
     from ..services.email import EmailService
 except ImportError:
@@ -26,12 +32,19 @@ except ImportError:
         PasswordResetConfirm,
         PasswordResetToken,
     )
-    from utils.security import verify_password, get_password_hash, create_access_token
+    from utils.security import (
+        verify_and_update_password,
+        get_password_hash,
+        create_access_token,
+        invalidate_cached_user,
+    )
     from config import settings
     from services.email import EmailService
 
 
 class AuthService:
+    __slots__ = ("session",)
+
     def __init__(self, session: Session):
         self.session = session
 
@@ -52,21 +65,39 @@ class AuthService:
             return None
         if not user.is_active:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            # Rehash legacy bcrypt passwords with the current scheme
+            user.hashed_password = new_hash
+            self.session.add(user)
+            self.session.commit()
         return user
 
-    def create_user(self, user_register: UserRegister) -> User:
+    def create_user(
+        self, user_register: UserRegister, background_tasks: BackgroundTasks
+    ) -> User:
         """Create a new user"""
-        # Check if username already exists
-        if self.get_user_by_username(user_register.username):
+        # Check if username or email already exists (one query)
+        existing = self.session.exec(
+            select(User.username, User.email)
+            .where(
+                or_(
+                    User.username == user_register.username,
+                    User.email == user_register.email,
+                )
+            )
+            .limit(2)
+        ).all()
+
+        if any(row.username == user_register.username for row in existing):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already registered",
             )
 
-        # Check if email already exists
-        if self.get_user_by_email(user_register.email):
+        if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
@@ -85,15 +116,21 @@ class AuthService:
 
         new_user = User(**user_data)
         self.session.add(new_user)
-        self.session.commit()
-        self.session.refresh(new_user)
-
-        # Send welcome email
         try:
-            EmailService.send_welcome_email(new_user.email, new_user.username)
-        except Exception as e:
-            # Log error but don't fail user creation
-            print(f"Failed to send welcome email: {e}")
+            self.session.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent signup; unique indexes reject it
+            self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username or email already registered",
+            )
+
+        # Send welcome email once the response is out (failures are logged
+        # by EmailService and never fail user creation)
+        background_tasks.add_task(
+            EmailService.send_welcome_email, new_user.email, new_user.username
+        )
 
         return new_user
 
@@ -107,14 +144,13 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-        access_token = create_access_token(
-            data={"sub": user.username}, expires_delta=access_token_expires
-        )
+        access_token = create_access_token(data={"sub": user.username})
 
         return Token(access_token=access_token)
 
-    def request_password_reset(self, reset_request: PasswordResetRequest) -> dict:
+    def request_password_reset(
+        self, reset_request: PasswordResetRequest, background_tasks: BackgroundTasks
+    ) -> dict:
         """Generate password reset token and send email"""
         user = self.get_user_by_email(reset_request.email)
         if not user:
@@ -134,13 +170,14 @@ class AuthService:
         self.session.add(db_token)
         self.session.commit()
 
-        # Send reset email
-        try:
-            EmailService.send_password_reset_email(
-                user.email, user.username, reset_token
-            )
-        except Exception as e:
-            print(f"Failed to send password reset email: {e}")
+        # Send reset email after responding, so response time doesn't depend
+        # on Resend (or reveal whether the email exists)
+        background_tasks.add_task(
+            EmailService.send_password_reset_email,
+            user.email,
+            user.username,
+            reset_token,
+        )
 
         return {"message": "If the email exists, a reset link has been sent"}
 
@@ -175,5 +212,6 @@ class AuthService:
         db_token.is_used = True
 
         self.session.commit()
+        invalidate_cached_user(user.id)
 
         return {"message": "Password reset successfully"}
@@ -1,51 +1,89 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
 from typing import Dict, Any
 
 try:
     from ..models.user import User
+    from ..models.link import Link
+    from ..models.analytics import ClickEvent
     from ..models.email import EmailLog, EmailType
     from ..services.analytics import AnalyticsService
-    from ..services.email import EmailService
+    from ..config import settings
+    from ..services.email import EmailService, EMAIL_BATCH_SIZE
 except ImportError:
     from models.user import User
+    from models.link import Link
+    from models.analytics import ClickEvent
     from models.email import EmailLog, EmailType
     from services.analytics import AnalyticsService
-    from services.email import EmailService
+    from config import settings
+    from services.email import EmailService, EMAIL_BATCH_SIZE
+
+logger = logging.getLogger("bioclick.email")
+
+# Concurrent Resend requests; Resend's default API limit is 2 requests per
+# second, and send_batch retries anything that still gets a 429
+EMAIL_SEND_WORKERS = 2
 
 
 class EmailScheduler:
     @staticmethod
     def send_weekly_analytics_emails(session: Session):
         """Send weekly analytics emails to all active users"""
-        print(f"🚀 Starting weekly analytics email job at {datetime.now(timezone.utc)}")
+        logger.info("Starting weekly analytics email job")
+
+        # Feature flag check
+        if not settings.send_analytics_emails:
+            logger.info("Analytics emails disabled")
+            return {"sent": 0, "errors": 0}
 
         # Calculate the period (last 7 days)
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=7)
 
-        # Get all active users
-        statement = select(User).where(User.is_active == True)
-        users = session.exec(statement).all()
+        # Users already emailed for this period, fetched once up front
+        already_sent = set(
+            session.exec(
+                select(EmailLog.user_id).where(
+                    EmailLog.email_type == EmailType.ANALYTICS_SUMMARY,
+                    EmailLog.analytics_period_start >= start_date,
+                    EmailLog.success == True,
+                )
+            ).all()
+        )
 
         analytics_service = AnalyticsService(session)
         sent_count = 0
         error_count = 0
 
-        for user in users:
+        # Rendered summaries waiting to go out in batches: (user, message)
+        pending: list[tuple[User, Dict[str, Any]]] = []
+
+        # Only users with at least one click this period need their analytics
+        # computed; inactive users are filtered out in the database
+        had_clicks = (
+            select(ClickEvent.id)
+            .join(Link, Link.id == ClickEvent.link_id)
+            .where(Link.user_id == User.id, ClickEvent.clicked_at >= start_date)
+            .exists()
+        )
+
+        # Stream active users in chunks instead of loading them all at once
+        statement = (
+            select(User)
+            .where(User.is_active == True, had_clicks)
+            .execution_options(yield_per=500)
+        )
+
+        for user in session.exec(statement):
             try:
                 # Check if we already sent analytics for this period
-                existing_log = session.exec(
-                    select(EmailLog).where(
-                        EmailLog.user_id == user.id,
-                        EmailLog.email_type == EmailType.ANALYTICS_SUMMARY,
-                        EmailLog.analytics_period_start >= start_date,
-                        EmailLog.success == True,
+                if user.id in already_sent:
+                    logger.debug(
+                        "Skipping %s - already sent for this period", user.email
                     )
-                ).first()
-
-                if existing_log:
-                    print(f"📧 Skipping {user.email} - already sent for this period")
                     continue
 
                 # Get user's analytics for the past week
@@ -56,32 +94,73 @@ class EmailScheduler:
 
                 # Only send if user has some activity
                 if analytics_data.get("total_clicks", 0) > 0:
-                    result = EmailService.send_analytics_summary(
-                        user.email,
-                        user.username,
-                        analytics_data,
-                        session=session,
-                        user_id=user.id,
-                        period_start=start_date,
-                        period_end=end_date,
+                    subject, html_content = EmailService.render_analytics_summary(
+                        user.email, user.username, analytics_data
                     )
-
-                    if result.get("success"):
-                        print(f"✅ Sent weekly analytics to {user.email}")
-                        sent_count += 1
-                    else:
-                        print(
-                            f"❌ Failed to send to {user.email}: {result.get('error', 'Unknown error')}"
-                        )
-                        error_count += 1
+                    message = {
+                        "to": user.email,
+                        "subject": subject,
+                        "html": html_content,
+                    }
+                    pending.append((user, message))
                 else:
-                    print(f"📊 Skipping {user.email} - no activity this week")
+                    logger.debug("Skipping %s - no activity this week", user.email)
 
             except Exception as e:
-                print(f"❌ Failed to send analytics email to {user.email}: {e}")
+                logger.error("Failed to send analytics email to %s: %s", user.email, e)
                 error_count += 1
-        print(
-            f"📊 Weekly analytics job completed: {sent_count} sent, {error_count} errors"
+
+        # End the read transaction so the connection goes back to the pool
+        # while we wait on Resend; each batch commit checks one out briefly
+        session.commit()
+
+        # One Resend request per batch, with batches sent concurrently; the
+        # session is only used from this thread as each batch completes
+        batches = [
+            pending[i : i + EMAIL_BATCH_SIZE]
+            for i in range(0, len(pending), EMAIL_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=EMAIL_SEND_WORKERS) as executor:
+            futures = {
+                executor.submit(
+                    EmailService.send_batch, [message for _, message in batch]
+                ): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                result = future.result()
+
+                session.add_all(
+                    [
+                        EmailLog(
+                            user_id=user.id,
+                            email_type=EmailType.ANALYTICS_SUMMARY,
+                            recipient_email=user.email,
+                            subject=message["subject"],
+                            success=result["success"],
+                            error_message=result.get("error"),
+                            analytics_period_start=start_date,
+                            analytics_period_end=end_date,
+                        )
+                        for user, message in batch
+                    ]
+                )
+                session.commit()
+
+                if result["success"]:
+                    logger.debug("Sent weekly analytics to %d users", len(batch))
+                    sent_count += len(batch)
+                else:
+                    logger.error(
+                        "Failed to send to %d users: %s", len(batch), result["error"]
+                    )
+                    error_count += len(batch)
+
+        logger.info(
+            "Weekly analytics job completed: %d sent, %d errors",
+            sent_count,
+            error_count,
         )
         return {"sent": sent_count, "errors": error_count}
 
@@ -90,15 +169,17 @@ class EmailScheduler:
         """Get statistics about analytics email sending"""
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
 
-        statement = select(EmailLog).where(
+        # Let the database count and find the latest send instead of loading logs
+        statement = select(
+            func.count(EmailLog.id).filter(EmailLog.success == True),
+            func.count(EmailLog.id).filter(EmailLog.success == False),
+            func.max(EmailLog.sent_at).filter(EmailLog.success == True),
+        ).where(
             EmailLog.email_type == EmailType.ANALYTICS_SUMMARY,
             EmailLog.sent_at >= cutoff_date,
         )
 
-        logs = session.exec(statement).all()
-
-        total_sent = len([log for log in logs if log.success])
-        total_failed = len([log for log in logs if not log.success])
+        total_sent, total_failed, last_sent = session.exec(statement).one()
 
         return {
             "total_sent": total_sent,
@@ -108,7 +189,5 @@ class EmailScheduler:
                 if (total_sent + total_failed) > 0
                 else 0
             ),
-            "last_sent": max(
-                [log.sent_at for log in logs if log.success], default=None
-            ),
+            "last_sent": last_sent,
         }
@@ -1,14 +1,73 @@
-from sqlmodel import Session, select
+import threading
+from collections import Counter
+from sqlmodel import Session, select, and_, func
 from fastapi import HTTPException, status
-from datetime import datetime, timezone
 
 try:
-    from ..models.link import Link, LinkCreate, LinkUpdate
+    from ..models.link import Link, LinkCreate, LinkUpdate, LinkPublic
+    from ..models.user import User
+    from ..models._time import utcnow
+    from ..utils.cache import cache_get, cache_set, cache_delete, cache_incr
 except ImportError:
-    from models.link import Link, LinkCreate, LinkUpdate
+    from models.link import Link, LinkCreate, LinkUpdate, LinkPublic
+    from models.user import User
+    from models._time import utcnow
+    from utils.cache import cache_get, cache_set, cache_delete, cache_incr
+
+# Redirect lookups are cached in Redis; edits invalidate the entry
+LINK_CACHE_TTL_SECONDS = 300
+
+
+# Pending click counts, added to link.click_count by tasks.click_counts
+CLICK_COUNT_KEY_PREFIX = "link:clicks:"
+
+# In-process pending click counts, used when Redis is unset or unreachable
+_click_buffer: Counter[int] = Counter()
+_click_buffer_lock = threading.Lock()
+
+
+# Columns backing LinkPublic; list endpoints select these instead of
+# hydrating tracked Link instances
+_LINK_PUBLIC_COLUMNS = tuple(getattr(Link, field) for field in LinkPublic.model_fields)
+
+
+def _link_cache_key(link_id: int) -> str:
+    return f"link:{link_id}"
+
+
+def _count_click(link_id: int) -> int:
+    """Add a pending click and return the link's pending total"""
+    pending = cache_incr(f"{CLICK_COUNT_KEY_PREFIX}{link_id}")
+    if pending is not None:
+        return pending
+
+    with _click_buffer_lock:
+        _click_buffer[link_id] += 1
+        return _click_buffer[link_id]
+
+
+def take_buffered_click_counts() -> dict[int, int]:
+    """Snapshot and reset the in-process click buffer"""
+    with _click_buffer_lock:
+        counts = dict(_click_buffer)
+        _click_buffer.clear()
+    return counts
+
+
+def restore_buffered_click_counts(counts: dict[int, int]) -> None:
+    """Put counts back into the buffer after a failed flush"""
+    with _click_buffer_lock:
+        _click_buffer.update(counts)
+
+
+def record_click(link_id: int) -> None:
+    """Count a click on an already validated link (redirect path)"""
+    _count_click(link_id)
 
 
 class LinkService:
+    __slots__ = ("session",)
+
     def __init__(self, session: Session):
         self.session = session
 
@@ -21,18 +80,33 @@ class LinkService:
             )
         return link
 
+    def get_link_cached(self, link_id: int) -> LinkPublic:
+        """Get link by ID through the Redis cache (read-through)"""
+        cached = cache_get(_link_cache_key(link_id))
+        if cached is not None:
+            return LinkPublic.model_validate_json(cached)
+
+        link = LinkPublic.model_validate(self.get_link(link_id))
+        cache_set(
+            _link_cache_key(link_id), link.model_dump_json(), LINK_CACHE_TTL_SECONDS
+        )
+        return link
+
     def get_user_links(
         self, user_id: int, skip: int = 0, limit: int = 100
-    ) -> list[Link]:
+    ) -> list[LinkPublic]:
         """Get all links for a user with pagination"""
         statement = (
-            select(Link)
+            select(*_LINK_PUBLIC_COLUMNS)
             .where(Link.user_id == user_id)
             .order_by(Link.display_order, Link.created_at.desc())
             .offset(skip)
             .limit(limit)
         )
-        return list(self.session.exec(statement).all())
+        return [
+            LinkPublic.model_validate(row._mapping)
+            for row in self.session.exec(statement)
+        ]
 
     def create_link(self, link_create: LinkCreate, user_id: int) -> Link:
         """Create new link"""
@@ -42,7 +116,6 @@ class LinkService:
         new_link = Link(**link_data)
         self.session.add(new_link)
         self.session.commit()
-        self.session.refresh(new_link)
         return new_link
 
     def update_link(self, link_id: int, link_update: LinkUpdate) -> Link:
@@ -53,10 +126,13 @@ class LinkService:
         update_data = link_update.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(link, key, value)
+        # exclude_unset drops LinkUpdate's default, so stamp edits here
+        if "updated_at" not in update_data:
+            link.updated_at = utcnow()
 
         self.session.add(link)
         self.session.commit()
-        self.session.refresh(link)
+        cache_delete(_link_cache_key(link_id))
         return link
 
     def delete_link(self, link_id: int) -> None:
@@ -64,8 +140,9 @@ class LinkService:
         link = self.get_link(link_id)
         self.session.delete(link)
         self.session.commit()
+        cache_delete(_link_cache_key(link_id))
 
-    def increment_click_count(self, link_id: int) -> Link:
+    def increment_click_count(self, link_id: int) -> LinkPublic:
         """Increment click count for a link"""
         link = self.get_link(link_id)
 
@@ -74,32 +151,52 @@ class LinkService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Link is not active"
             )
 
-        link.click_count += 1
-        link.updated_at = datetime.now(timezone.utc)
+        # Buffered (Redis or in-process); the row is updated by the flusher
+        pending = _count_click(link_id)
+        return LinkPublic.model_validate(
+            link, update={"click_count": link.click_count + pending}
+        )
 
-        self.session.add(link)
-        self.session.commit()
-        self.session.refresh(link)
-        return link
+    def get_public_user_links_version(self, username: str) -> str | None:
+        """Summarise a user's active links for cheap ETag revalidation"""
+        # Adds, removals, (de)activations, edits and flushed clicks all move
+        # the count or a max timestamp, without loading any link rows
+        statement = (
+            select(
+                func.count(Link.id),
+                func.max(Link.created_at),
+                func.max(Link.updated_at),
+            )
+            .select_from(User)
+            .outerjoin(Link, and_(Link.user_id == User.id, Link.is_active == True))
+            .where(User.username == username, User.is_active == True)
+            .group_by(User.id)
+        )
+        row = self.session.exec(statement).first()
+        if row is None:
+            return None
+        count, last_created, last_updated = row
+        return f"{count}:{last_created}:{last_updated}"
 
-    def get_public_user_links(self, username: str) -> list[Link]:
+    def get_public_user_links(self, username: str) -> list[LinkPublic]:
         """Get active links for a user (public view)"""
-        try:
-            from ..models.user import User
-        except ImportError:
-            from models.user import User
-
-        statement = select(User).where(User.username == username)
-        user = self.session.exec(statement).first()
+        # One round-trip: the outer join keeps a row for an active user with
+        # no active links, so "user not found" is still distinguishable
+        statement = (
+            select(User.id.label("owner_id"), *_LINK_PUBLIC_COLUMNS)
+            .outerjoin(Link, and_(Link.user_id == User.id, Link.is_active == True))
+            .where(User.username == username, User.is_active == True)
+            .order_by(Link.display_order, Link.created_at.desc())
+        )
+        rows = self.session.exec(statement).all()
 
-        if not user or not user.is_active:
+        if not rows:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        statement = (
-            select(Link)
-            .where(Link.user_id == user.id, Link.is_active == True)
-            .order_by(Link.display_order, Link.created_at.desc())
-        )
-        return list(self.session.exec(statement).all())
+        return [
+            LinkPublic.model_validate(row._mapping)
+            for row in rows
+            if row.id is not None
+        ]
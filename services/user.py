@@ -4,11 +4,15 @@ from fastapi import HTTPException, status
 
 try:
     from ..models.user import User, UserUpdate
+    from ..utils.security import invalidate_cached_user
 except ImportError:
     from models.user import User, UserUpdate
+    from utils.security import invalidate_cached_user
 
 
 class UserService:
+    __slots__ = ("session",)
+
     def __init__(self, session: Session):
         self.session = session
 
@@ -31,7 +35,7 @@ class UserService:
 
         self.session.add(user)
         self.session.commit()
-        self.session.refresh(user)
+        invalidate_cached_user(user_id)
         return user
 
     def update_password(self, user_id: int, new_hashed_password: str) -> None:
@@ -47,6 +51,7 @@ class UserService:
 
         self.session.add(user)
         self.session.commit()
+        invalidate_cached_user(user_id)
 
     def delete_user(self, user_id: int) -> None:
         """Delete user account"""
@@ -58,3 +63,4 @@ class UserService:
 
         self.session.delete(user)
         self.session.commit()
+        invalidate_cached_user(user_id)
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from contextlib import suppress
+import redis
+from sqlalchemy import bindparam, update
+
+try:
+    from ..database import engine
+    from ..models.link import Link
+    from ..models._time import utcnow
+    from ..services.link import (
+        CLICK_COUNT_KEY_PREFIX,
+        restore_buffered_click_counts,
+        take_buffered_click_counts,
+    )
+    from ..utils.cache import redis_client
+except ImportError:
+    from database import engine
+    from models.link import Link
+    from models._time import utcnow
+    from services.link import (
+        CLICK_COUNT_KEY_PREFIX,
+        restore_buffered_click_counts,
+        take_buffered_click_counts,
+    )
+    from utils.cache import redis_client
+
+logger = logging.getLogger("bioclick.clicks")
+
+CLICK_COUNT_FLUSH_INTERVAL_SECONDS = 5
+
+# One UPDATE statement executed for every link with pending clicks
+_add_clicks = (
+    update(Link.__table__)
+    .where(Link.__table__.c.id == bindparam("b_link_id"))
+    .values(
+        click_count=Link.__table__.c.click_count + bindparam("b_delta"),
+        updated_at=bindparam("b_updated_at"),
+    )
+)
+
+
+def _take_pending_click_counts() -> dict[int, int]:
+    """Atomically take (GETDEL) every pending per-link click count from Redis"""
+    deltas: dict[int, int] = {}
+    if redis_client is None:
+        return deltas
+
+    try:
+        for key in redis_client.scan_iter(
+            match=f"{CLICK_COUNT_KEY_PREFIX}*", count=1000
+        ):
+            delta = redis_client.getdel(key)
+            if delta:
+                link_id = int(key.decode().removeprefix(CLICK_COUNT_KEY_PREFIX))
+                deltas[link_id] = deltas.get(link_id, 0) + int(delta)
+    except redis.RedisError as e:
+        # Still flush what was taken and the in-process buffer
+        logger.warning("Failed to read pending click counts from Redis: %s", e)
+    return deltas
+
+
+def flush_click_counts() -> None:
+    """Add pending click counts to link.click_count in one transaction"""
+    redis_deltas = _take_pending_click_counts()
+    buffered_deltas = take_buffered_click_counts()
+    if not redis_deltas and not buffered_deltas:
+        return
+
+    deltas = dict(redis_deltas)
+    for link_id, delta in buffered_deltas.items():
+        deltas[link_id] = deltas.get(link_id, 0) + delta
+
+    now = utcnow()
+    rows = [
+        {"b_link_id": link_id, "b_delta": delta, "b_updated_at": now}
+        for link_id, delta in deltas.items()
+    ]
+    try:
+        with engine.begin() as connection:
+            connection.execute(_add_clicks, rows)
+    except Exception:
+        # Put the counts back so the next flush retries them; the local
+        # buffer first, so a Redis failure here can't lose it
+        restore_buffered_click_counts(buffered_deltas)
+        try:
+            for link_id, delta in list(redis_deltas.items()):
+                redis_client.incrby(f"{CLICK_COUNT_KEY_PREFIX}{link_id}", delta)
+                del redis_deltas[link_id]
+        except redis.RedisError:
+            restore_buffered_click_counts(redis_deltas)
+        raise
+
+
+async def run_click_count_flusher() -> None:
+    """Flush pending click counts every interval until cancelled"""
+    while True:
+        await asyncio.sleep(CLICK_COUNT_FLUSH_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(flush_click_counts)
+        except Exception as e:
+            logger.error("Failed to flush click counts: %s", e)
+
+
+# Global flusher task
+_flusher_task: asyncio.Task | None = None
+
+
+def start_click_count_flusher():
+    """Start the click count flusher"""
+    global _flusher_task
+    if _flusher_task is None:
+        _flusher_task = asyncio.create_task(run_click_count_flusher())
+
+
+async def stop_click_count_flusher():
+    """Stop the flusher and write out any remaining counts"""
+    global _flusher_task
+    if _flusher_task is None:
+        return
+
+    _flusher_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await _flusher_task
+    _flusher_task = None
+
+    try:
+        await asyncio.to_thread(flush_click_counts)
+    except Exception as e:
+        logger.error("Failed to flush click counts: %s", e)
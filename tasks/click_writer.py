@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from contextlib import suppress
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+try:
+    from ..database import engine
+    from ..models.analytics import ClickEvent
+    from ..models.link import Link
+    from ..services.analytics import CLICK_QUEUE
+except ImportError:
+    from database import engine
+    from models.analytics import ClickEvent
+    from models.link import Link
+    from services.analytics import CLICK_QUEUE
+
+logger = logging.getLogger("bioclick.clicks")
+
+# Flush when this many events are queued or the interval elapses
+CLICK_BATCH_SIZE = 500
+CLICK_FLUSH_INTERVAL_SECONDS = 0.1
+
+
+def write_click_events(rows: list[dict]) -> None:
+    """Insert a batch of click events with a single executemany"""
+    with Session(engine) as session:
+        try:
+            session.execute(insert(ClickEvent), rows)
+            session.commit()
+            return
+        except IntegrityError:
+            session.rollback()
+
+        # A link was deleted while its clicks were queued; keep the rest
+        link_ids = {row["link_id"] for row in rows}
+        existing = set(session.exec(select(Link.id).where(Link.id.in_(link_ids))))
+        valid_rows = [row for row in rows if row["link_id"] in existing]
+        if len(valid_rows) < len(rows):
+            logger.warning(
+                "Dropping %d click events for deleted links",
+                len(rows) - len(valid_rows),
+            )
+        if valid_rows:
+            session.execute(insert(ClickEvent), valid_rows)
+            session.commit()
+
+
+async def _write_batch(batch: list[dict]) -> None:
+    """Write a batch off the event loop, logging (not raising) failures"""
+    try:
+        await asyncio.to_thread(write_click_events, batch)
+    except Exception as e:
+        logger.error("Failed to write %d click events: %s", len(batch), e)
+
+
+async def run_click_writer() -> None:
+    """Drain the click queue in batches until cancelled"""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        batch = [await CLICK_QUEUE.get()]
+
+        # Take whatever backlog is already queued without waiting per item
+        for _ in range(min(CLICK_BATCH_SIZE - 1, CLICK_QUEUE.qsize())):
+            batch.append(CLICK_QUEUE.get_nowait())
+
+        deadline = loop.time() + CLICK_FLUSH_INTERVAL_SECONDS
+        try:
+            while len(batch) < CLICK_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(CLICK_QUEUE.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Don't lose events already taken off the queue
+            await _write_batch(batch)
+            raise
+
+        await _write_batch(batch)
+
+
+# Global writer task
+_writer_task: asyncio.Task | None = None
+
+
+def start_click_writer():
+    """Start the background click writer on the running event loop"""
+    global _writer_task
+    if _writer_task is None:
+        _writer_task = asyncio.create_task(run_click_writer())
+
+
+async def stop_click_writer():
+    """Stop the click writer and flush anything still queued"""
+    global _writer_task
+    if _writer_task is not None:
+        _writer_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _writer_task
+        _writer_task = None
+
+    remaining = []
+    while not CLICK_QUEUE.empty():
+        remaining.append(CLICK_QUEUE.get_nowait())
+    if remaining:
+        await _write_batch(remaining)
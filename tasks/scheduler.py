@@ -1,20 +1,21 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from sqlmodel import Session
-from datetime import datetime
-import atexit
+import asyncio
+import logging
 
 try:
-    from ..database import engine
+    from ..database import SessionLocal
     from ..services.email_scheduler import EmailScheduler
 except ImportError:
-    from database import engine
+    from database import SessionLocal
     from services.email_scheduler import EmailScheduler
 
+logger = logging.getLogger("bioclick.scheduler")
+
 
 def create_scheduler():
-    """Create and configure the background scheduler"""
-    scheduler = BackgroundScheduler()
+    """Create and configure the scheduler (runs on the app's event loop)"""
+    scheduler = AsyncIOScheduler()
 
     # Add weekly analytics email job (every Monday at 9 AM)
     scheduler.add_job(
@@ -25,31 +26,23 @@ def create_scheduler():
         replace_existing=True,
     )
 
-    # Add a test job that runs every hour (remove in production)
-    scheduler.add_job(
-        func=test_scheduler_job,
-        trigger=CronTrigger(minute=0),  # Every hour at minute 0
-        id="test_scheduler",
-        name="Test Scheduler Health",
-        replace_existing=True,
-    )
-
     return scheduler
 
 
-def send_weekly_analytics_job():
+def _run_weekly_analytics_emails() -> dict:
+    """Run the weekly analytics email job with its own session"""
+    with SessionLocal() as session:
+        return EmailScheduler.send_weekly_analytics_emails(session)
+
+
+async def send_weekly_analytics_job():
     """Job function to send weekly analytics emails"""
     try:
-        with Session(engine) as session:
-            result = EmailScheduler.send_weekly_analytics_emails(session)
-            print(f"📊 Weekly analytics job result: {result}")
+        # The DB and Resend calls are blocking; keep them off the event loop
+        result = await asyncio.to_thread(_run_weekly_analytics_emails)
+        logger.info("Weekly analytics job result: %s", result)
     except Exception as e:
-        print(f"❌ Weekly analytics job failed: {e}")
-
-
-def test_scheduler_job():
-    """Test job to verify scheduler is working"""
-    print(f"⏰ Scheduler health check at {datetime.now()}")
+        logger.error("Weekly analytics job failed: %s", e)
 
 
 # Global scheduler instance
@@ -57,15 +50,12 @@ scheduler = None
 
 
 def start_scheduler():
-    """Start the background scheduler"""
+    """Start the scheduler (call from the running event loop)"""
     global scheduler
     if scheduler is None:
         scheduler = create_scheduler()
         scheduler.start()
-        print("🚀 Background scheduler started")
-
-        # Shut down the scheduler when exiting the app
-        atexit.register(lambda: scheduler.shutdown())
+        logger.info("Background scheduler started")
 
 
 def stop_scheduler():
@@ -74,4 +64,18 @@ def stop_scheduler():
     if scheduler is not None:
         scheduler.shutdown()
         scheduler = None
-        print("🛑 Background scheduler stopped")
+        logger.info("Background scheduler stopped")
+
+
+def get_scheduler_health() -> dict:
+    """Report whether the scheduler is running and when each job runs next"""
+    if scheduler is None or not scheduler.running:
+        return {"running": False, "jobs": {}}
+
+    return {
+        "running": True,
+        "jobs": {
+            job.id: job.next_run_time.isoformat() if job.next_run_time else None
+            for job in scheduler.get_jobs()
+        },
+    }
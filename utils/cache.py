@@ -0,0 +1,51 @@
+import redis
+
+try:
+    from ..config import settings
+except ImportError:
+    from config import settings
+
+# Shared Redis client (pooled connections); None when REDIS_URL is unset
+redis_client: redis.Redis | None = (
+    redis.Redis.from_url(settings.redis_url) if settings.redis_url else None
+)
+
+
+def cache_get(key: str) -> bytes | None:
+    """Read a cached value; a miss when Redis is unset or unreachable"""
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.get(key)
+    except redis.RedisError:
+        return None
+
+
+def cache_set(key: str, value: str, ttl_seconds: int) -> None:
+    """Store a value with an expiry (best effort)"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.set(key, value, ex=ttl_seconds)
+    except redis.RedisError:
+        pass
+
+
+def cache_delete(key: str) -> None:
+    """Drop a cached value (best effort)"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(key)
+    except redis.RedisError:
+        pass
+
+
+def cache_incr(key: str) -> int | None:
+    """Atomically increment a counter; None when Redis is unset or unreachable"""
+    if redis_client is None:
+        return None
+    try:
+        return redis_client.incr(key)
+    except redis.RedisError:
+        return None
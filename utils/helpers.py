@@ -1,31 +1,37 @@
 from fastapi import Request
 
+# Proxy headers carrying the client IP, in priority order (lowercase, as
+# stored in the raw ASGI header list)
+_CLIENT_IP_HEADERS = (b"x-forwarded-for", b"x-real-ip", b"cf-connecting-ip")
+_CLIENT_IP_HEADER_SET = frozenset(_CLIENT_IP_HEADERS)
 
-def get_client_ip(request: Request) -> str:
-    """Extract the real client IP address from request headers"""
+_LOCALHOST_IPS = frozenset({"127.0.0.1", "::1"})
 
-    # Check for forwarded IP (when behind proxy/load balancer)
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        # Take the first IP (original client)
-        return forwarded.split(",")[0].strip()
 
-    # check for real IP header
-    real_ip = request.headers.get("X-Real-IP")
-    if real_ip:
-        return real_ip
+def get_client_ip(request: Request) -> str:
+    """Extract the real client IP address from request headers"""
 
-    # Check for CF-Connecting-IP (CloudFlare)
-    cf_ip = request.headers.get("CF-Connecting-IP")
-    if cf_ip:
-        return cf_ip
+    # Scan the raw headers once instead of one case-insensitive lookup per
+    # header: X-Forwarded-For (proxy/load balancer), X-Real-IP, then
+    # CF-Connecting-IP (CloudFlare)
+    found: dict[bytes, bytes] = {}
+    for name, value in request.headers.raw:
+        if name in _CLIENT_IP_HEADER_SET and value and name not in found:
+            if name == b"x-forwarded-for":
+                # Take the first IP (original client)
+                return value.decode("latin-1").split(",", 1)[0].strip()
+            found[name] = value
+
+    for name in _CLIENT_IP_HEADERS:
+        if name in found:
+            return found[name].decode("latin-1")
 
     # Fall back to direct connection IP
     if request.client and request.client.host:
         client_ip = request.client.host
 
         # For development: if localhost, use a test IP for geo-analytics
-        if client_ip in ["127.0.0.1", "::1"]:
+        if client_ip in _LOCALHOST_IPS:
             return "8.8.8.8"  # Google's IP for testing geo-analytics
 
         return client_ip
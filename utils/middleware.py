@@ -0,0 +1,55 @@
+import logging
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Access logger (records are written by a background listener thread)
+access_logger = logging.getLogger("bioclick.access")
+
+# Security headers applied to every response, pre-encoded as raw ASGI
+# header pairs so each response only needs a single list extend
+_SECURITY_HEADERS_RAW: list[tuple[bytes, bytes]] = [
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (
+        b"content-security-policy",
+        b"default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline';",
+    ),
+]
+
+
+class SecurityAndLogMiddleware:
+    """Pure ASGI middleware adding security headers and access logging"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = None
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    *_SECURITY_HEADERS_RAW,
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+        access_logger.info(
+            "%s %s - Status: %s - Time: %.3fs",
+            scope["method"],
+            scope["path"],
+            status_code,
+            time.perf_counter() - start_time,
+        )
@@ -0,0 +1,17 @@
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+try:
+    from ..config import settings
+except ImportError:
+    from config import settings
+
+# Shared rate limiter. With REDIS_URL set, counters live in Redis so limits
+# are enforced across all workers instead of per process. The moving window
+# avoids the double burst a fixed window allows at each minute boundary.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.redis_url or "memory://",
+    strategy="moving-window",
+    in_memory_fallback_enabled=settings.redis_url is not None,
+)
@@ -1,14 +1,40 @@
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
+import hashlib
+import json
+import threading
+import time
 import jwt
+from cachetools import TLRUCache
 from passlib.context import CryptContext
 
 try:
     from ..config import settings
+    from ..models.user import User
+    from ..utils.cache import cache_get, cache_incr
 except ImportError:
     from config import settings
+    from models.user import User
+    from utils.cache import cache_get, cache_incr
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context: new hashes use argon2id; existing bcrypt hashes
+# still verify and are upgraded on the next successful login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+    bcrypt__rounds=10,
+)
+
+# JWT key and codecs, built once instead of per request
+_JWT_KEY = settings.secret_key.encode()
+_JWT_ALGORITHMS = [settings.algorithm]
+_JWT_DECODE_OPTIONS = {"verify_signature": True, "require": ["exp", "sub"]}
+_jws = jwt.PyJWS()
+_jwt = jwt.PyJWT(options=_JWT_DECODE_OPTIONS)
+_ACCESS_TOKEN_EXPIRE_SECONDS = settings.access_token_expire_minutes * 60
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -16,6 +42,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password and return a replacement hash if the scheme is outdated"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
     return pwd_context.hash(password)
@@ -23,30 +56,121 @@ def get_password_hash(password: str) -> str:
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token"""
-    to_encode = data.copy()
-
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        lifetime = expires_delta.total_seconds()
     else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.access_token_expire_minutes
-        )
+        lifetime = _ACCESS_TOKEN_EXPIRE_SECONDS
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.secret_key, algorithm=settings.algorithm
+    # Integer exp; the payload is serialized once and signed directly
+    payload = {**data, "exp": int(time.time() + lifetime)}
+    return _jws.encode(
+        json.dumps(payload, separators=(",", ":")).encode(),
+        _JWT_KEY,
+        algorithm=settings.algorithm,
     )
-    return encoded_jwt
 
 
 def verify_token(token: str) -> dict | None:
     """Verify JWT token and return payload"""
-    try:
-        payload = jwt.decode(
-            token, settings.secret_key, algorithms=[settings.algorithm]
-        )
+    key = _token_cache_key(token)
+    with _payload_cache_lock:
+        payload = _payload_cache.get(key)
+    if payload is not None:
         return payload
+
+    try:
+        # Single verified decode; required claims are checked in the same pass
+        payload = _jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
     except jwt.ExpiredSignatureError:
         return None
     except jwt.PyJWTError:
-        None
+        return None
+
+    with _payload_cache_lock:
+        _payload_cache[key] = payload
+    return payload
+
+
+# Decoded payload cache: a token's claims never change, so a verified
+# payload is reused until the token itself expires
+_payload_cache: TLRUCache = TLRUCache(
+    maxsize=10_000,
+    ttu=lambda _key, payload, now: min(
+        now + _ACCESS_TOKEN_EXPIRE_SECONDS, payload["exp"]
+    ),
+    timer=time.time,
+)
+_payload_cache_lock = threading.Lock()
+
+
+# Verified token cache: maps a digest of the raw JWT to a detached snapshot of
+# the authenticated user, so repeat requests skip signature verification and
+# the user lookup. Entries never outlive the token's own expiry.
+TOKEN_CACHE_TTL_SECONDS = 30
+
+_token_cache: TLRUCache = TLRUCache(
+    maxsize=10_000,
+    ttu=lambda _key, entry, now: min(now + TOKEN_CACHE_TTL_SECONDS, entry[1]),
+    timer=time.time,
+)
+_token_cache_lock = threading.Lock()
+
+# Bumped in Redis whenever a user is invalidated. Each worker reads it at
+# most once per poll interval (not per request) and clears its whole token
+# cache when it changes, so other workers catch up within about a second.
+TOKEN_CACHE_VERSION_KEY = "auth:token_cache_version"
+TOKEN_CACHE_VERSION_POLL_SECONDS = 1.0
+
+_seen_cache_version: bytes | None = None
+_next_version_poll = 0.0
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Hash the token so raw credentials are never kept in memory as keys"""
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def get_cached_user(token: str) -> User | None:
+    """Return the cached user for a previously verified token"""
+    _sync_cache_version()
+    with _token_cache_lock:
+        entry = _token_cache.get(_token_cache_key(token))
+    return entry[0] if entry else None
+
+
+def _sync_cache_version() -> None:
+    """Clear the cache if another worker invalidated a user (rate limited)"""
+    global _seen_cache_version, _next_version_poll
+    now = time.time()
+    with _token_cache_lock:
+        if now < _next_version_poll:
+            return
+        _next_version_poll = now + TOKEN_CACHE_VERSION_POLL_SECONDS
+
+    # None without Redis, so a single process never clears on its own
+    version = cache_get(TOKEN_CACHE_VERSION_KEY)
+    with _token_cache_lock:
+        if version != _seen_cache_version:
+            _seen_cache_version = version
+            _token_cache.clear()
+
+
+def cache_user(token: str, user: User, expires_at: float) -> None:
+    """Cache a verified token's user until the TTL or token expiry"""
+    # Store a detached copy so session commits/closes can't expire it
+    snapshot = User.model_validate(user)
+    with _token_cache_lock:
+        _token_cache[_token_cache_key(token)] = (snapshot, expires_at)
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop every cached token for a user (password/profile changes)"""
+    with _token_cache_lock:
+        stale_keys = [
+            key for key, (user, _) in _token_cache.items() if user.id == user_id
+        ]
+        for key in stale_keys:
+            _token_cache.pop(key, None)
+
+    # Tell the other workers (no-op without Redis)
+    cache_incr(TOKEN_CACHE_VERSION_KEY)